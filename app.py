@@ -1,30 +1,68 @@
+from __future__ import annotations
+
 import os
-import json
+import sys
+import asyncio
+import functools
+import logging
+import threading
 import gradio as gr
-from typing import List, Dict, Any
-from modules.input_handler import InputHandler
-from modules.test_generator import generate_test
-from modules.skill_normalizer import save_normalized_skills
+from array import array
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+from modules.test_generator import ANSWER_LETTER_INDEX, OPTION_LETTERS, PROMPT_VERSION, iter_test_questions, save_test_data, warm_up_ollama, QUESTION_MODEL
+from modules.skill_normalizer import save_normalized_skills, load_normalized_skills
 from modules.profile_summary import save_profile_summary
 from modules.domain_suggester import get_domain_suggestions
+from modules.storage import ensure_data_dir, read_json, write_json
 
-# Create data directory if it doesn't exist
-os.makedirs("data", exist_ok=True)
+logger = logging.getLogger("skillscope")
 
-# Initialize the input handler
-input_handler = InputHandler()
+@functools.lru_cache(maxsize=None)
+def get_input_handler():
+    """Create the shared InputHandler on first use.
 
-class TestState:
-    def __init__(self):
-        self.questions = []
-        self.correct_answers = []
-        self.user_answers = []
-        self.current_question = 0
-        self.score = 0
+    Importing it pulls in rapidfuzz and loads the skills master list, so code that
+    only imports this module (e.g. the formatters) skips that. The PDF/DOCX libraries
+    are loaded later still, by the first upload that needs them.
+    """
+    from modules.input_handler import InputHandler
+    return InputHandler()
 
-test_state = TestState()
+# slots=True needs Python 3.10+, the minimum noted in requirements.txt
+@dataclass(slots=True)
+class TestState:
+    """Progress of one session's test; gr.State gives every browser session its own copy.
 
-def load_previous_module_data() -> Dict[str, Any]:
+    Answers are stored as option indices (0-3) in compact signed-byte arrays; the
+    option text is looked up from the question only when results are displayed.
+    """
+    questions: list[dict[str, Any]] = field(default_factory=list)
+    correct_answers: array = field(default_factory=lambda: array('b'))
+    user_answers: array = field(default_factory=lambda: array('b'))
+    current_question: int = 0
+    score: int = 0
+
+RESULTS_DIVIDER = "=" * 50
+# Fixed banners of the results screen, formatted once at import
+RESULTS_HEADER = f"{RESULTS_DIVIDER}\nTest Results\n{RESULTS_DIVIDER}\n\n"
+RESULTS_DETAILS_HEADER = f"\n{RESULTS_DIVIDER}\nDetailed Results:\n{RESULTS_DIVIDER}\n\n"
+RESULTS_DIVIDER_LINE = f"{RESULTS_DIVIDER}\n"
+CORRECT_MARK = "✅ Correct!\n\n"
+INCORRECT_MARK = "❌ Incorrect\n\n"
+
+# Shared update payloads for the error and per-question paths. Gradio pops "value"
+# from the update dicts it is given, so only payloads without a value are shared;
+# anything that sets a value must be a fresh gr.update(...) per call.
+HIDE_UPDATE = gr.update(visible=False)
+SHOW_UPDATE = gr.update(visible=True)
+NO_UPDATE = gr.update()
+
+DOMAIN_SUGGESTIONS_PENDING = "## 🎯 Domain Suggestions\n\n⏳ Generating career domain recommendations from your results..."
+
+def load_previous_module_data() -> dict[str, Any]:
     """Load data generated by previous modules/files."""
     data = {
         "normalized_skills": [],
@@ -35,38 +73,49 @@ def load_previous_module_data() -> Dict[str, Any]:
     try:
         normalized_path = os.path.join("data", "normalized_skills.json")
         if os.path.exists(normalized_path):
-            with open(normalized_path, "r", encoding="utf-8") as f:
-                normalized_data = json.load(f)
-                data["normalized_skills"] = normalized_data.get("normalized_skills", [])
+            normalized_data = read_json(normalized_path)
+            data["normalized_skills"] = normalized_data.get("normalized_skills", [])
     except Exception as e:
         print(f"[WARNING] Could not load normalized skills: {e}")
 
     try:
         user_skills_path = os.path.join("data", "user_skills.json")
         if os.path.exists(user_skills_path):
-            with open(user_skills_path, "r", encoding="utf-8") as f:
-                user_skills_data = json.load(f)
-                data["raw_skills"] = user_skills_data.get("raw_skills", [])
+            user_skills_data = read_json(user_skills_path)
+            data["raw_skills"] = user_skills_data.get("raw_skills", [])
     except Exception as e:
         print(f"[WARNING] Could not load raw skills: {e}")
 
     try:
         evaluation_path = os.path.join("data", "evaluation_result.json")
         if os.path.exists(evaluation_path):
-            with open(evaluation_path, "r", encoding="utf-8") as f:
-                data["evaluation"] = json.load(f)
+            data["evaluation"] = read_json(evaluation_path)
     except Exception as e:
         print(f"[WARNING] Could not load evaluation results: {e}")
 
     return data
 
-def get_domain_skill_level_summary(requested_domain: str) -> str:
+@functools.lru_cache(maxsize=64)
+def render_skill_bullets(skills: tuple) -> str:
+    """Render skills as a Markdown bullet list, reusing the text for repeated skill sets."""
+    # One join instead of formatting every bullet separately
+    return "- " + "\n- ".join(skills) if skills else ""
+
+def save_domain_selection_summary(summary_payload: dict[str, Any]) -> None:
+    """Save the domain selection summary to JSON."""
+    try:
+        ensure_data_dir()
+        write_json(os.path.join("data", "domain_selection_summary.json"), summary_payload)
+    except Exception as e:
+        print(f"[WARNING] Could not save domain selection summary JSON: {e}")
+
+async def get_domain_skill_level_summary(requested_domain: str) -> str:
     """Return requested domain with known skills and level using previously saved module data."""
     domain = (requested_domain or "").strip()
     if not domain:
         return "⚠️ Please enter a domain name to continue."
 
-    previous_data = load_previous_module_data()
+    previous_data = await asyncio.to_thread(load_previous_module_data)
     evaluation = previous_data.get("evaluation", {})
 
     level = evaluation.get("level", "Not available (complete test to get level)")
@@ -89,141 +138,143 @@ def get_domain_skill_level_summary(requested_domain: str) -> str:
         "known_skills": known_skills
     }
 
-    try:
-        os.makedirs("data", exist_ok=True)
-        with open(os.path.join("data", "domain_selection_summary.json"), "w", encoding="utf-8") as f:
-            json.dump(summary_payload, f, indent=4, ensure_ascii=False)
-    except Exception as e:
-        print(f"[WARNING] Could not save domain selection summary JSON: {e}")
+    await asyncio.to_thread(save_domain_selection_summary, summary_payload)
 
-    response = f"## 📌 Domain Selection Summary\n\n"
-    response += f"**Requested Domain:** {domain}\n\n"
-    response += f"**Current Level (from previous assessment):** {level}\n"
+    parts = [
+        "## 📌 Domain Selection Summary\n\n",
+        f"**Requested Domain:** {domain}\n\n",
+        f"**Current Level (from previous assessment):** {level}\n"
+    ]
     if score is not None and total:
-        response += f"**Assessment Score:** {score}/{total}\n"
+        parts.append(f"**Assessment Score:** {score}/{total}\n")
 
     if known_skills:
-        response += "\n**Known Skills (from previous module data):**\n"
-        response += "\n".join([f"- {skill}" for skill in known_skills])
+        parts.append("\n**Known Skills (from previous module data):**\n")
+        parts.append(render_skill_bullets(tuple(known_skills)))
     else:
-        response += "\n**Known Skills:** Not available yet. Please complete Skill Extraction/Test first."
+        parts.append("\n**Known Skills:** Not available yet. Please complete Skill Extraction/Test first.")
 
-    response += "\n\n📄 JSON saved to: `data/domain_selection_summary.json`"
+    parts.append("\n\n📄 JSON saved to: `data/domain_selection_summary.json`")
 
-    return response
+    return "".join(parts)
 
-def save_normalized_skills(skills: List[str]) -> List[str]:
-    """Save normalized skills to a file."""
-    try:
-        normalized_skills = [skill.strip().lower() for skill in skills if skill.strip()]
-        seen = set()
-        unique_skills = []
-        for skill in normalized_skills:
-            if skill not in seen:
-                seen.add(skill)
-                unique_skills.append(skill)
-        
-        os.makedirs("data", exist_ok=True)
-        with open("data/normalized_skills.json", "w") as f:
-            json.dump({"normalized_skills": unique_skills}, f, indent=2)
-        return unique_skills
-    except Exception as e:
-        print(f"Error saving normalized skills: {e}")
-        return []
+def _finish_question(question: dict[str, Any]) -> dict[str, Any]:
+    """Render the option block once per question; cached tests reuse it on every display."""
+    question['rendered_options'] = "".join(
+        f"{letter}) {option}\n" for letter, option in zip(OPTION_LETTERS, question['options'])
+    )
+    return question
+
+def _question_from_generated(question: dict[str, Any]) -> dict[str, Any] | None:
+    """Convert a generator question (answer given as a letter) into the form the test uses."""
+    options = list(question.get('options') or ())
+    answer_index = ANSWER_LETTER_INDEX.get(question.get('correct_answer'))
+    if not question.get('question') or answer_index is None or answer_index >= len(options):
+        return None
+    return _finish_question({
+        'question': question['question'],
+        'options': options,
+        'correct_answer': options[answer_index],
+        'correct_index': answer_index,
+        'skill': question.get('skill')
+    })
+
+_TEST_CACHE_SIZE = 256
+_generated_tests: dict[tuple, tuple] = {}
+# Tests are generated on worker threads, so several sessions can store at once
+_generated_tests_lock = threading.Lock()
+
+def _unique_skills(skills: list[str]) -> list[str]:
+    """Drop blanks and case/whitespace repeats, keeping the first spelling and the order."""
+    unique: dict[str, str] = {}
+    for skill in skills:
+        stripped = skill.strip()
+        if stripped:
+            unique.setdefault(stripped.lower(), stripped)
+    return list(unique.values())
+
+def iter_generate_test(skills: list[str], subject: str) -> Iterator[dict[str, Any]]:
+    """Yield parsed questions as the model produces them, one per skill, in the given order.
+
+    skills should already be deduplicated (see _unique_skills). A fully generated test
+    is cached per (prompt version, skills, subject), with the skills in canonical
+    order, so "Python, git" and "git, python" share an entry; failed generations and
+    tests containing template fallback questions are not cached, so that a retry
+    reaches the model again once Ollama is back.
+    """
+    position = {skill.lower(): index for index, skill in enumerate(skills)}
+    skills_key = tuple(sorted(position))
+    cache_key = (PROMPT_VERSION, skills_key, subject)
+    cached = _generated_tests.get(cache_key)
+    if cached is not None:
+        logger.info("Reusing cached test for skills: %s", skills_key)
+        # The entry may have been generated for the same skills in another order
+        yield from sorted(cached, key=lambda q: position.get((q.get('skill') or '').lower(), len(position)))
+        return
+
+    generated = []
+    questions = []
+    for question in iter_test_questions(skills, subject):
+        generated.append(question)
+        parsed = _question_from_generated(question)
+        if parsed is not None:
+            questions.append(parsed)
+            yield parsed
+
+    if not questions:
+        return
+    # Template questions mean Ollama was down or failing; leave the retry to reach it
+    cacheable = all(not q.get('fallback') for q in generated)
 
-def load_normalized_skills() -> List[str]:
-    """Load skills from normalized_skills.json file."""
     try:
-        filepath = os.path.join("data", "normalized_skills.json")
-        if os.path.exists(filepath):
-            with open(filepath, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                skills = data.get("normalized_skills", [])
-                print(f"[INFO] Loaded {len(skills)} skills from {filepath}")
-                return skills
-        else:
-            print(f"[WARNING] File not found: {filepath}")
-            return []
+        save_test_data(generated)
     except Exception as e:
-        print(f"[ERROR] Error loading normalized skills: {e}")
-        return []
+        print(f"[WARNING] Could not save test data: {e}")
 
-def parse_test_output(test_text: str) -> List[Dict[str, Any]]:
-    """Parse the raw test output into a structured format."""
-    questions = []
-    current_question = None
-    current_options = []
-    
-    lines = [line.strip() for line in test_text.split('\n') if line.strip()]
-    
-    i = 0
-    while i < len(lines):
-        line = lines[i]
-        
-        if line.lower().startswith('question') and ':' in line:
-            if current_question and current_question.get('options'):
-                questions.append(current_question)
-                
-            question_text = line.split(':', 1)[1].strip()
-            current_question = {
-                'question': question_text,
-                'options': [],
-                'correct_answer': None
-            }
-            current_options = []
-            i += 1
-            continue
-            
-        if (current_question is not None and 
-            len(line) > 2 and 
-            line[0].lower() in 'abcd' and 
-            line[1] in '.)'):
-            
-            option_text = line[3:].strip()
-            current_question['options'].append(option_text)
-            i += 1
-            continue
-            
-        if (current_question is not None and 
-            'correct answer:' in line.lower()):
-            
-            correct_letter = line.split(':')[-1].strip().lower()
-            if correct_letter and correct_letter in 'abcd':
-                answer_index = ord(correct_letter) - ord('a')
-                if 0 <= answer_index < len(current_question['options']):
-                    current_question['correct_answer'] = current_question['options'][answer_index]
-            i += 1
-            continue
-            
-        i += 1
-    
-    if current_question and current_question.get('options') and current_question.get('correct_answer'):
-        questions.append(current_question)
-    
-    return questions
+    if not cacheable:
+        logger.info("Not caching test with template questions for skills: %s", skills_key)
+        return
+
+    with _generated_tests_lock:
+        if cache_key not in _generated_tests and len(_generated_tests) >= _TEST_CACHE_SIZE:
+            _generated_tests.pop(next(iter(_generated_tests)))
+        _generated_tests[cache_key] = tuple(questions)
 
-def process_skill_extraction(resume_file, skills_json_file, manual_skills):
-    """Process inputs and extract skills only."""
+async def process_skill_extraction(resume_file, skills_json_file, manual_skills, progress=gr.Progress()):
+    """Process inputs and extract skills only.
+
+    Blocking stages run on worker threads so the event loop keeps serving other sessions,
+    and a status line is streamed as soon as the raw skills are known.
+    """
     try:
-        result = input_handler.process_inputs(
+        progress(0.1, desc="Extracting skills")
+        result = await get_input_handler().process_inputs_async(
             resume_path=resume_file.name if resume_file else None,
             skills_json_path=skills_json_file.name if skills_json_file else None,
             manual_skills=manual_skills
         )
         
         if not result["success"] or not result["skills"]:
-            return "❌ No skills were extracted. Please check your inputs and try again."
+            yield "❌ No skills were extracted. Please check your inputs and try again."
+            return
         
-        print(f"\n[DEBUG] Raw skills before normalization: {result['skills']}")
-        normalized_skills = save_normalized_skills(result["skills"])
-        print(f"[DEBUG] Normalized skills: {normalized_skills}")
+        yield f"⏳ Found {len(result['skills'])} skills, normalizing and saving your profile..."
         
-        if not normalized_skills:
-            return "❌ Failed to normalize skills. No valid skills were found."
+        logger.debug("Raw skills before normalization: %s", result["skills"])
+        # The profile summary is built from the raw skills saved by the input handler,
+        # so it does not have to wait for normalization.
+        progress(0.5, desc="Normalizing skills and saving profile summary")
+        normalized_skills, _ = await asyncio.gather(
+            asyncio.to_thread(save_normalized_skills, result["skills"]),
+            asyncio.to_thread(save_profile_summary)
+        )
+        logger.debug("Normalized skills: %s", normalized_skills)
         
-        save_profile_summary()
+        if not normalized_skills:
+            yield "❌ Failed to normalize skills. No valid skills were found."
+            return
         
-        skills_list = "\n".join([f"- {skill}" for skill in normalized_skills])
+        skills_list = render_skill_bullets(tuple(normalized_skills))
         success_message = f"""## ✅ Skills Extracted Successfully!
 
 ### Extracted Skills:
@@ -233,74 +284,98 @@ def process_skill_extraction(resume_file, skills_json_file, manual_skills):
 
 Your skills have been saved to `data/normalized_skills.json`. You can now use the **Terminal-Style Test** tab to test your knowledge!
 """
-        return success_message
+        yield success_message
         
     except Exception as e:
-        import traceback
-        print(f"[ERROR] Exception in process_skill_extraction: {str(e)}")
-        print(traceback.format_exc())
-        return f"❌ An error occurred: {str(e)}"
+        logger.exception("Exception in process_skill_extraction: %s", e)
+        yield f"❌ An error occurred: {str(e)}"
+
+async def start_terminal_test(use_extracted_skills, manual_skills_input, test_state, progress=gr.Progress()):
+    """Start a terminal-style test with skills from file or manual input.
 
-def start_terminal_test(use_extracted_skills, manual_skills_input):
-    """Start a terminal-style test with skills from file or manual input."""
+    Questions are streamed into the terminal output while they are generated.
+    """
     skills = []
     
     if use_extracted_skills:
-        skills = load_normalized_skills()
+        skills = await asyncio.to_thread(load_normalized_skills)
         if not skills:
-            return "❌ No extracted skills found. Please extract skills first or enter manual skills.", gr.update(visible=False)
+            yield "❌ No extracted skills found. Please extract skills first or enter manual skills.", HIDE_UPDATE, test_state
+            return
     else:
         if manual_skills_input and manual_skills_input.strip():
-            skills = [s.strip() for s in manual_skills_input.split(',') if s.strip()]
+            skills = get_input_handler().parse_manual_skills(manual_skills_input)
         else:
-            return "❌ Please enter skills manually or select 'Use Extracted Skills'.", gr.update(visible=False)
+            yield "❌ Please enter skills manually or select 'Use Extracted Skills'.", HIDE_UPDATE, test_state
+            return
     
     if not skills:
-        return "❌ No skills available. Please extract skills or enter them manually.", gr.update(visible=False)
+        yield "❌ No skills available. Please extract skills or enter them manually.", HIDE_UPDATE, test_state
+        return
+    
+    logger.info("Generating test for skills: %s", skills)
+    # Generated in the user's order; iter_generate_test keys its cache canonically
+    skills = _unique_skills(skills)
+    total = len(skills)
+    progress(0, desc="Generating test questions")
     
-    print(f"[INFO] Generating test for skills: {skills}")
-    test_text = generate_test(skills, "Professional Skills")
-    test_questions = parse_test_output(test_text)
+    test_questions = []
+    log_lines = [f"Generating {total} questions...\n"]
+    questions_stream = iter_generate_test(skills, "Professional Skills")
+    while True:
+        question = await asyncio.to_thread(next, questions_stream, None)
+        if question is None:
+            break
+        test_questions.append(question)
+        progress(len(test_questions) / total, desc="Generating test questions")
+        log_lines.append(f"[{len(test_questions)}/{total}] Question ready\n")
+        yield "".join(log_lines), HIDE_UPDATE, test_state
     
     if not test_questions:
-        return "❌ Failed to generate test questions. Please try again.\n\nMake sure Ollama is running if you want AI-generated questions.", gr.update(visible=False)
+        yield "❌ Failed to generate test questions. Please try again.\n\nMake sure Ollama is running if you want AI-generated questions.", HIDE_UPDATE, test_state
+        return
     
+    # Every new test starts from a fresh per-session state
+    test_state = TestState()
     test_state.questions = test_questions
-    test_state.current_question = 0
-    test_state.score = 0
-    test_state.user_answers = []
-    test_state.correct_answers = [q['correct_answer'] for q in test_questions]
+    test_state.correct_answers = array('b', (q['correct_index'] for q in test_questions))
     
-    return show_question(0)
+    yield (*show_question(test_state, 0), test_state)
 
-def show_question(q_index):
+def show_question(test_state, q_index):
     """Display the current question in terminal-style format."""
     if q_index >= len(test_state.questions):
-        return show_results()
+        return show_results(test_state)
     
     q = test_state.questions[q_index]
-    question_text = f"Question {q_index + 1} of {len(test_state.questions)}\n\n"
-    question_text += f"{q['question']}\n\n"
-    for i, option in enumerate(q['options']):
-        question_text += f"{chr(97+i)}) {option}\n"
-    
-    question_text += "\nYour answer (a/b/c/d): "
-    return question_text, gr.update(visible=True)
+    question_text = (
+        f"Question {q_index + 1} of {len(test_state.questions)}\n\n"
+        f"{q['question']}\n\n"
+        f"{q['rendered_options']}"
+        "\nYour answer (a/b/c/d): "
+    )
+    return question_text, SHOW_UPDATE
+
+async def process_terminal_answer(answer, current_output, test_state):
+    """Process the user's answer in the terminal-style test.
 
-def process_terminal_answer(answer, current_output):
-    """Process the user's answer in the terminal-style test."""
-    if not hasattr(test_state, 'current_question'):
-        return "No active test. Please start a new test.", gr.update(visible=False), gr.update()
+    When the last answer is in, the results are shown before the (slow) domain
+    suggestions are generated, which arrive in a second update.
+    """
+    if not test_state.questions or test_state.current_question >= len(test_state.questions):
+        yield "No active test. Please start a new test.", HIDE_UPDATE, NO_UPDATE, test_state
+        return
     
     q_index = test_state.current_question
     q = test_state.questions[q_index]
-    answer = answer.strip().lower()
+    answer_index = ANSWER_LETTER_INDEX.get(answer.strip())
     
-    if answer in ['a', 'b', 'c', 'd']:
-        user_answer = q['options'][ord(answer) - ord('a')]
-        test_state.user_answers.append(user_answer)
+    if answer_index is not None and answer_index < len(q['options']):
+        test_state.user_answers.append(answer_index)
+        # Compare option positions rather than the (possibly long) option text
+        is_correct = answer_index == test_state.correct_answers[q_index]
         
-        if user_answer == q['correct_answer']:
+        if is_correct:
             test_state.score += 1
             result = "✅ Correct!\n\n"
         else:
@@ -309,22 +384,47 @@ def process_terminal_answer(answer, current_output):
         test_state.current_question += 1
         
         if test_state.current_question >= len(test_state.questions):
-            # Test is complete, show results
-            final_result, input_update, domain_msg = show_results()
-            return final_result, input_update, domain_msg
+            # Test is complete, show results; saving them and asking Ollama for
+            # domains block, so keep both off the event loop
+            final_result, input_update = await asyncio.to_thread(show_results, test_state)
+            # Built per call: Gradio pops "value" out of the update dict it is given
+            yield final_result, input_update, gr.update(value=DOMAIN_SUGGESTIONS_PENDING, visible=True), test_state
+            domain_msg = await asyncio.to_thread(build_domain_suggestions_message)
+            yield final_result, input_update, gr.update(value=domain_msg, visible=True), test_state
         else:
-            # Show next question
-            next_question = show_question(test_state.current_question)
-            if isinstance(next_question, tuple):
-                return result + next_question[0], next_question[1], gr.update()
-            return current_output + "\n" + result + next_question, gr.update(visible=False), gr.update()
+            # Show next question; the answer box is already visible, so only the
+            # terminal output changes and the client renders a single update.
+            next_question, _ = show_question(test_state, test_state.current_question)
+            yield result + next_question, NO_UPDATE, NO_UPDATE, test_state
     else:
-        return current_output + "\nInvalid input. Please enter a, b, c, or d: ", gr.update(visible=True), gr.update()
+        # Re-show the current question rather than appending to the transcript, so
+        # repeated invalid answers do not grow the text sent back on every submit
+        question_text, _ = show_question(test_state, q_index)
+        yield "Invalid input. Please enter a, b, c, or d.\n\n" + question_text, NO_UPDATE, NO_UPDATE, test_state
 
-def show_results():
-    """Display the test results in terminal-style format and save to JSON."""
-    from datetime import datetime
+def build_domain_suggestions_message() -> str:
+    """Build the Domain Suggestions tab content from the latest evaluation."""
+    try:
+        domains = get_domain_suggestions()
+        domain_list = "\n".join(f"### {i}. {domain}" for i, domain in enumerate(domains, 1))
+        domain_message = (
+            "## 🎯 Domain Suggestions\n\n"
+            "Based on your assessment and skill profile, you might be interested in these career domains:\n\n"
+            f"{domain_list}"
+            "\n\n---\n\n"
+            "💡 **Tip:** Research these domains further and align your learning path with your career goals!"
+        )
+    except Exception as e:
+        print(f"[ERROR] ❌ Failed to generate domain suggestions: {e}")
+        domain_message = (
+            "## ⚠️ Domain Suggestions Unavailable\n\n"
+            "Could not generate domain suggestions at this time. Please try again later."
+        )
     
+    return domain_message
+
+def show_results(test_state):
+    """Display the test results in terminal-style format and save to JSON."""
     total = len(test_state.questions)
     score = test_state.score
     score_percent = (score / total) * 100
@@ -337,107 +437,101 @@ def show_results():
     else:
         level = "Advanced"
     
-    # Identify strengths and weak areas
+    # One pass over the answers builds the per-question results, sorts each topic
+    # into strengths or weak areas and formats the detailed terminal lines
+    detailed_results = []
+    detail_parts = []
     strengths = []
     weak_areas = []
     
-    for i, (q, user_ans) in enumerate(zip(test_state.questions, test_state.user_answers)):
-        topic = q.get('skill', f"Question {i+1}")
-        if user_ans == q['correct_answer']:
-            strengths.append(topic)
-        else:
-            weak_areas.append(topic)
+    for i, (q, user_index, correct_index) in enumerate(
+        zip(test_state.questions, test_state.user_answers, test_state.correct_answers), 1
+    ):
+        is_correct = user_index == correct_index
+        question_text = q['question']
+        user_answer = q['options'][user_index]
+        correct_answer = q['correct_answer']
+        detailed_results.append({
+            "question": question_text,
+            "user_answer": user_answer,
+            "correct_answer": correct_answer,
+            "is_correct": is_correct
+        })
+        (strengths if is_correct else weak_areas).append(q.get('skill', f"Question {i}"))
+        detail_parts.append(
+            f"Question {i}: {question_text}\n"
+            f"Your answer: {user_answer}\n"
+            f"Correct answer: {correct_answer}\n"
+        )
+        detail_parts.append(CORRECT_MARK if is_correct else INCORRECT_MARK)
     
-    # Create evaluation result
+    # Create evaluation result; one clock read keeps test_id and timestamp in step
+    finished_at = datetime.now()
     evaluation_result = {
-        "test_id": f"test_{int(datetime.now().timestamp())}",
+        "test_id": f"test_{int(finished_at.timestamp())}",
         "score": score,
         "total_questions": total,
         "percentage": round(score_percent, 2),
         "level": level,
         "strengths": strengths,
         "weak_areas": weak_areas,
-        "timestamp": datetime.now().isoformat(),
-        "detailed_results": [
-            {
-                "question": q['question'],
-                "user_answer": user_ans,
-                "correct_answer": q['correct_answer'],
-                "is_correct": user_ans == q['correct_answer']
-            }
-            for q, user_ans in zip(test_state.questions, test_state.user_answers)
-        ]
+        "timestamp": finished_at.isoformat(),
+        "detailed_results": detailed_results
     }
     
     # Save evaluation result to JSON
-    os.makedirs("data", exist_ok=True)
+    ensure_data_dir()
     result_file = os.path.join("data", "evaluation_result.json")
     try:
-        with open(result_file, "w", encoding="utf-8") as f:
-            json.dump(evaluation_result, f, indent=4, ensure_ascii=False)
+        write_json(result_file, evaluation_result)
         print(f"[INFO] ✅ Evaluation results saved to {result_file}")
     except Exception as e:
         print(f"[ERROR] ❌ Failed to save evaluation results: {e}")
     
-    # Get domain suggestions
-    try:
-        domains = get_domain_suggestions()
-        domain_message = "## 🎯 Domain Suggestions\n\n"
-        domain_message += "Based on your assessment and skill profile, you might be interested in these career domains:\n\n"
-        domain_message += "\n".join([f"### {i+1}. {domain}" for i, domain in enumerate(domains)])
-        domain_message += "\n\n---\n\n"
-        domain_message += "💡 **Tip:** Research these domains further and align your learning path with your career goals!"
-    except Exception as e:
-        print(f"[ERROR] ❌ Failed to generate domain suggestions: {e}")
-        domain_message = "## ⚠️ Domain Suggestions Unavailable\n\n"
-        domain_message += "Could not generate domain suggestions at this time. Please try again later."
-    
     # Format terminal output
-    result = "="*50 + "\n"
-    result += "Test Results\n"
-    result += "="*50 + "\n\n"
-    result += f"Your score: {score}/{total} ({score_percent:.1f}%)\n"
-    result += f"Level: {level}\n\n"
+    parts = [
+        RESULTS_HEADER,
+        f"Your score: {score}/{total} ({score_percent:.1f}%)\n",
+        f"Level: {level}\n\n"
+    ]
     
     if score_percent >= 80:
-        result += "🎉 Excellent work! You have a strong understanding of these skills.\n"
+        parts.append("🎉 Excellent work! You have a strong understanding of these skills.\n")
     elif score_percent >= 60:
-        result += "👍 Good job! You have a decent understanding, but there's room for improvement.\n"
+        parts.append("👍 Good job! You have a decent understanding, but there's room for improvement.\n")
     else:
-        result += "📚 Keep practicing! Review the skills and try again.\n"
+        parts.append("📚 Keep practicing! Review the skills and try again.\n")
     
-    result += "\n" + "="*50 + "\n"
-    result += "Detailed Results:\n"
-    result += "="*50 + "\n\n"
-    
-    for i, (q, user_ans) in enumerate(zip(test_state.questions, test_state.user_answers), 1):
-        result += f"Question {i}: {q['question']}\n"
-        result += f"Your answer: {user_ans}\n"
-        result += f"Correct answer: {q['correct_answer']}\n"
-        if user_ans == q['correct_answer']:
-            result += "✅ Correct!\n\n"
-        else:
-            result += "❌ Incorrect\n\n"
+    parts.append(RESULTS_DETAILS_HEADER)
+    parts.extend(detail_parts)
     
     # Add summary
-    result += "="*50 + "\n"
+    parts.append(RESULTS_DIVIDER_LINE)
     if strengths:
-        result += f"✅ Strengths: {', '.join(strengths[:3])}\n"
+        parts.append(f"✅ Strengths: {', '.join(strengths[:3])}\n")
     if weak_areas:
-        result += f"📚 Areas to improve: {', '.join(weak_areas[:3])}\n"
-    result += "="*50 + "\n"
-    result += "Test completed. Thank you for using SkillScope!\n"
-    result += f"📄 Results saved to: {result_file}\n"
-    result += "\n💡 Check the 'Domain Suggestions' tab for career recommendations!\n"
-    result += "="*50
+        parts.append(f"📚 Areas to improve: {', '.join(weak_areas[:3])}\n")
+    parts.append(RESULTS_DIVIDER_LINE)
+    parts.append(
+        "Test completed. Thank you for using SkillScope!\n"
+        f"📄 Results saved to: {result_file}\n"
+        "\n💡 Check the 'Domain Suggestions' tab for career recommendations!\n"
+    )
+    parts.append(RESULTS_DIVIDER)
+    result = "".join(parts)
     
-    return result, gr.update(visible=False), gr.update(value=domain_message, visible=True)
+    return result, HIDE_UPDATE
 
-# Create Gradio interface
-with gr.Blocks(title="SkillScope - Skill Assessment Tool") as demo:
-    gr.Markdown("# SkillScope - Skill Assessment Tool")
+@functools.lru_cache(maxsize=None)
+def create_ui() -> gr.Blocks:
+    """Build the Gradio interface once, on first use rather than at import time."""
+    with gr.Blocks(title="SkillScope - Skill Assessment Tool") as demo:
+        gr.Markdown("# SkillScope - Skill Assessment Tool")
     
-    custom_css = """
+        # Per-session test progress, so concurrent users never share questions or scores
+        test_session = gr.State(TestState())
+    
+        custom_css = """
     .terminal-output {
         font-family: monospace;
         white-space: pre;
@@ -457,58 +551,59 @@ with gr.Blocks(title="SkillScope - Skill Assessment Tool") as demo:
         border-left: 4px solid #4CAF50;
     }
     """
-    gr.HTML(f'<style>{custom_css}</style>')
+        gr.HTML(f'<style>{custom_css}</style>')
     
-    with gr.Tabs() as main_tabs:
-        # Skill Extraction Tab
-        with gr.TabItem("Skill Extraction"):
-            with gr.Row():
-                with gr.Column(scale=1):
-                    gr.Markdown("### Upload your resume or skills")
-                    resume_upload = gr.File(label="Upload Resume (PDF/DOCX)", type="filepath", file_types=[".pdf", ".docx"])
-                    skills_upload = gr.File(label="Or upload skills JSON", type="filepath", file_types=[".json"])
-                    manual_skills = gr.Textbox(
-                        label="Or enter skills manually (comma-separated)", 
-                        placeholder="e.g., Python, Machine Learning, Data Analysis"
-                    )
-                    extract_btn = gr.Button("Extract Skills", variant="primary")
+        with gr.Tabs() as main_tabs:
+            # Skill Extraction Tab
+            with gr.TabItem("Skill Extraction"):
+                with gr.Row():
+                    with gr.Column(scale=1):
+                        gr.Markdown("### Upload your resume or skills")
+                        resume_upload = gr.File(label="Upload Resume (PDF/DOCX)", type="filepath", file_types=[".pdf", ".docx"])
+                        skills_upload = gr.File(label="Or upload skills JSON", type="filepath", file_types=[".json"])
+                        manual_skills = gr.Textbox(
+                            label="Or enter skills manually (comma-separated)", 
+                            placeholder="e.g., Python, Machine Learning, Data Analysis"
+                        )
+                        extract_btn = gr.Button("Extract Skills", variant="primary")
                 
-                with gr.Column(scale=2):
-                    extraction_output = gr.Markdown("""## Welcome to SkillScope!
+                    with gr.Column(scale=2):
+                        extraction_output = gr.Markdown("""## Welcome to SkillScope!
 
 Upload your resume, skills JSON, or enter skills manually to extract and analyze your skills.
 
 After extraction, you can use the **Terminal-Style Test** tab to test your knowledge!
 """)
             
-            extract_btn.click(
-                fn=process_skill_extraction,
-                inputs=[resume_upload, skills_upload, manual_skills],
-                outputs=extraction_output
-            )
+                extract_btn.click(
+                    fn=process_skill_extraction,
+                    inputs=[resume_upload, skills_upload, manual_skills],
+                    outputs=extraction_output,
+                    concurrency_limit=4
+                )
         
-        # Terminal-Style Test Tab
-        with gr.TabItem("Terminal-Style Test"):
-            with gr.Row():
-                with gr.Column(scale=1):
-                    gr.Markdown("### Terminal-Style Skill Test")
+            # Terminal-Style Test Tab
+            with gr.TabItem("Terminal-Style Test"):
+                with gr.Row():
+                    with gr.Column(scale=1):
+                        gr.Markdown("### Terminal-Style Skill Test")
                     
-                    use_extracted = gr.Checkbox(
-                        label="Use Extracted Skills from normalized_skills.json",
-                        value=True,
-                        info="If checked, uses skills from the Skill Extraction tab"
-                    )
+                        use_extracted = gr.Checkbox(
+                            label="Use Extracted Skills from normalized_skills.json",
+                            value=True,
+                            info="If checked, uses skills from the Skill Extraction tab"
+                        )
                     
-                    manual_skills_terminal = gr.Textbox(
-                        label="Or enter skills manually (comma-separated)",
-                        value="",
-                        placeholder="e.g., Python, Git, SQL, JavaScript, Docker",
-                        info="Only used if 'Use Extracted Skills' is unchecked"
-                    )
+                        manual_skills_terminal = gr.Textbox(
+                            label="Or enter skills manually (comma-separated)",
+                            value="",
+                            placeholder="e.g., Python, Git, SQL, JavaScript, Docker",
+                            info="Only used if 'Use Extracted Skills' is unchecked"
+                        )
                     
-                    start_test_btn = gr.Button("Start Terminal Test", variant="primary")
+                        start_test_btn = gr.Button("Start Terminal Test", variant="primary")
                     
-                    gr.Markdown("""
+                        gr.Markdown(f"""
 **Instructions:**
 1. Choose to use extracted skills OR enter manual skills
 2. Click "Start Terminal Test" to begin
@@ -516,29 +611,29 @@ After extraction, you can use the **Terminal-Style Test** tab to test your knowl
 4. You'll see immediate feedback after each answer
 5. Complete all questions to see your final score and domain suggestions
 
-**Note:** Questions are generated using Ollama AI (phi3:mini model). Make sure Ollama is running for best results!
+**Note:** Questions are generated using Ollama AI ({QUESTION_MODEL} model). Make sure Ollama is running for best results!
                     """)
                 
-                with gr.Column(scale=2):
-                    terminal_output = gr.Textbox(
-                        label="Test Output",
-                        lines=20,
-                        max_lines=50,
-                        interactive=False,
-                        elem_classes=["terminal-output"]
-                    )
-                    terminal_input = gr.Textbox(
-                        label="Your Answer",
-                        placeholder="Type your answer (a/b/c/d) and press Enter",
-                        visible=False,
-                        container=False
-                    )
+                    with gr.Column(scale=2):
+                        terminal_output = gr.Textbox(
+                            label="Test Output",
+                            lines=20,
+                            max_lines=50,
+                            interactive=False,
+                            elem_classes=["terminal-output"]
+                        )
+                        terminal_input = gr.Textbox(
+                            label="Your Answer",
+                            placeholder="Type your answer (a/b/c/d) and press Enter",
+                            visible=False,
+                            container=False
+                        )
         
-        # Domain Suggestions Tab - Define BEFORE using it
-        with gr.TabItem("Domain Suggestions"):
-            with gr.Column():
-                domain_suggestions_output = gr.Markdown(
-                    """## 🎯 Domain Suggestions
+            # Domain Suggestions Tab - Define BEFORE using it
+            with gr.TabItem("Domain Suggestions"):
+                with gr.Column():
+                    domain_suggestions_output = gr.Markdown(
+                        """## 🎯 Domain Suggestions
 
 Complete the skill assessment test to receive personalized career domain recommendations based on your skills and performance.
 
@@ -549,37 +644,64 @@ Complete the skill assessment test to receive personalized career domain recomme
 
 Get started by going to the **Terminal-Style Test** tab!
 """,
-                    elem_classes=["domain-suggestion"]
-                )
+                        elem_classes=["domain-suggestion"]
+                    )
 
-                requested_domain_input = gr.Textbox(
-                    label="Enter the domain you want",
-                    placeholder="e.g., Data Science, Frontend Development, DevOps"
-                )
-                domain_summary_btn = gr.Button("Get Domain + Skills + Level", variant="primary")
-                domain_summary_output = gr.Markdown(
-                    "Type a domain above and click the button to view your known skills and current level.",
-                    elem_classes=["domain-suggestion"]
-                )
+                    requested_domain_input = gr.Textbox(
+                        label="Enter the domain you want",
+                        placeholder="e.g., Data Science, Frontend Development, DevOps"
+                    )
+                    domain_summary_btn = gr.Button("Get Domain + Skills + Level", variant="primary")
+                    domain_summary_output = gr.Markdown(
+                        "Type a domain above and click the button to view your known skills and current level.",
+                        elem_classes=["domain-suggestion"]
+                    )
     
-    # Event handlers - Define AFTER all components are created
-    start_test_btn.click(
-        fn=start_terminal_test,
-        inputs=[use_extracted, manual_skills_terminal],
-        outputs=[terminal_output, terminal_input]
-    )
+        # Event handlers - Define AFTER all components are created
+        start_test_btn.click(
+            fn=start_terminal_test,
+            inputs=[use_extracted, manual_skills_terminal, test_session],
+            outputs=[terminal_output, terminal_input, test_session],
+            concurrency_limit=4
+        )
     
-    terminal_input.submit(
-        fn=process_terminal_answer,
-        inputs=[terminal_input, terminal_output],
-        outputs=[terminal_output, terminal_input, domain_suggestions_output]
-    )
+        terminal_input.submit(
+            fn=process_terminal_answer,
+            inputs=[terminal_input, terminal_output, test_session],
+            outputs=[terminal_output, terminal_input, domain_suggestions_output, test_session],
+            concurrency_limit=16
+        )
 
-    domain_summary_btn.click(
-        fn=get_domain_skill_level_summary,
-        inputs=[requested_domain_input],
-        outputs=[domain_summary_output]
-    )
+        domain_summary_btn.click(
+            fn=get_domain_skill_level_summary,
+            inputs=[requested_domain_input],
+            outputs=[domain_summary_output],
+            concurrency_limit=16
+        )
+
+    # Handlers mostly wait on Ollama or disk, so let sessions overlap. The Ollama-bound
+    # handlers above cap themselves lower and the cheap ones raise their own limit.
+    demo.queue(default_concurrency_limit=8, max_size=64)
+
+    return demo
 
 if __name__ == "__main__":
-    demo.launch(server_name="127.0.0.1", server_port=7861)
\ No newline at end of file
+    # Debug output is only emitted when the level is lowered to DEBUG
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(name)s: %(message)s")
+    
+    # uvloop.install() is deprecated; set the policy directly while asyncio still has
+    # policies (deprecated from 3.14). Threads that build their own loop, like Gradio's
+    # uvicorn server, pick it up only if they go through the policy.
+    try:
+        import uvloop
+    except ImportError:
+        uvloop = None
+    if uvloop is not None and sys.version_info < (3, 14):
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        print("[INFO] uvloop installed as the default event loop policy")
+    
+    # Load the question model while the user is still uploading a resume
+    threading.Thread(target=warm_up_ollama, name="ollama-warmup", daemon=True).start()
+    # Load the skills list and fuzzy matcher before the first click needs them
+    get_input_handler()
+    create_ui().launch(server_name="127.0.0.1", server_port=7861)
\ No newline at end of file
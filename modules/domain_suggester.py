@@ -1,80 +1,190 @@
 # modules/domain_suggester.py
 import json
 import subprocess
-from typing import List, Dict, Any
-from pathlib import Path
+import threading
+from itertools import islice
+from typing import List, Dict, Any, Iterable, Iterator, Optional
+from modules.storage import dumps_json, ensure_data_dir, loads_json, read_json, write_json
+from modules.test_generator import OLLAMA_KEEP_ALIVE, get_ollama_session, requests
 
 def load_evaluation_results() -> Dict[str, Any]:
     """Load evaluation results from JSON file."""
     try:
-        with open("data/evaluation_result.json", "r") as f:
-            return json.load(f)
+        return read_json("data/evaluation_result.json")
     except Exception as e:
         print(f"Error loading evaluation results: {e}")
         return {}
 
-def generate_domain_suggestions(model: str = "gemma3:1b") -> List[str]:
-    """
-    Generate domain suggestions using Ollama.
-    Returns a list of 2-3 suggested domains.
-    """
-    eval_data = load_evaluation_results()
-    if not eval_data:
-        return ["General IT", "Software Development", "IT Operations"]
-    
+OLLAMA_GENERATE_URL = "http://localhost:11434/api/generate"
+SUGGESTION_TIMEOUT = 30  # seconds
+
+FALLBACK_DOMAINS = ["General IT", "Software Development", "IT Operations"]
+
+# Suggestions already generated in this process, keyed by assessment profile
+_SUGGESTION_CACHE_SIZE = 128
+_suggestion_cache: Dict[tuple, List[str]] = {}
+# Suggestions are requested from worker threads, so eviction and insert happen under a lock
+_suggestion_cache_lock = threading.Lock()
+
+def _profile_key(eval_data: Dict[str, Any]) -> tuple:
+    """Canonical, hashable form of everything the suggestion prompt depends on."""
+    return (
+        eval_data.get('level', 'Beginner'),
+        tuple(sorted(eval_data.get('strengths', []))),
+        tuple(sorted(eval_data.get('weak_areas', []))),
+        eval_data.get('score', 0),
+        eval_data.get('total_questions', 10),
+    )
+
+def _run_suggestion_model(key: tuple, model: str) -> List[str]:
+    """Ask Ollama for domains for one profile; returns [] if the call fails."""
+    level, strengths, weak_areas, score, total = key
     prompt = f"""Based on the following skill assessment results, suggest 2-3 most suitable IT career domains.
 Only return the domain names, one per line. No numbering or extra text.
 
 Assessment:
-- Level: {eval_data.get('level', 'Beginner')}
-- Strengths: {', '.join(eval_data.get('strengths', []))}
-- Weak Areas: {', '.join(eval_data.get('weak_areas', []))}
-- Score: {eval_data.get('score', 0)}/{eval_data.get('total_questions', 10)}
+- Level: {level}
+- Strengths: {', '.join(strengths)}
+- Weak Areas: {', '.join(weak_areas)}
+- Score: {score}/{total}
 
 Suggested domains:"""
     
+    if requests is None:
+        domains = _stream_domains_cli(prompt, model)
+    else:
+        domains = _stream_domains_http(prompt, model)
+    
+    if domains is None:
+        return []
+    while len(domains) < 2:
+        domains.append("General IT")
+    return domains[:3]
+
+def _first_domain_lines(lines: Iterable[str]) -> List[str]:
+    """Strip each line once and keep the first three non-blank ones."""
+    return list(islice(filter(None, map(str.strip, lines)), 3))
+
+def _stream_domains_http(prompt: str, model: str) -> Optional[List[str]]:
+    """
+    Stream the answer from the running Ollama server over the shared keep-alive session;
+    keep_alive keeps the model loaded between calls. Closing the response after three
+    lines stops the generation.
+    """
+    payload = {"model": model, "prompt": prompt, "stream": True, "keep_alive": OLLAMA_KEEP_ALIVE}
     try:
-        result = subprocess.run(
+        with get_ollama_session().post(OLLAMA_GENERATE_URL, json=payload, stream=True, timeout=SUGGESTION_TIMEOUT) as response:
+            if response.status_code == 200:
+                return _first_domain_lines(_iter_response_lines(response))
+            if response.status_code != 404:
+                print(f"Error generating domain suggestions: Ollama API error {response.status_code}")
+                return None
+    except Exception as e:
+        print(f"Error generating domain suggestions: {e}")
+        return None
+    # Unlike 'ollama run', the API does not pull a missing model
+    print(f"[INFO] Model {model} not found on the Ollama server, trying 'ollama run' to pull it")
+    return _stream_domains_cli(prompt, model)
+
+def _iter_response_lines(response) -> Iterator[str]:
+    """Reassemble the text lines of a streamed /api/generate response."""
+    pending = ""
+    for chunk in response.iter_lines():
+        if not chunk:
+            continue
+        message = loads_json(chunk)
+        pending += message.get("response", "")
+        *complete, pending = pending.split("\n")
+        yield from complete
+        if message.get("done"):
+            break
+    yield pending
+
+def _stream_domains_cli(prompt: str, model: str) -> Optional[List[str]]:
+    """Fallback without requests: read 'ollama run' line by line and stop it after three lines."""
+    try:
+        proc = subprocess.Popen(
             ["ollama", "run", model, prompt],
-            capture_output=True,
-            text=True,
-            timeout=30
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True
         )
+        # Same 30 s budget as the HTTP path; killing the process also ends the read loop
+        timer = threading.Timer(SUGGESTION_TIMEOUT, proc.kill)
+        timer.start()
+        try:
+            domains = _first_domain_lines(proc.stdout)
+            finished_early = len(domains) == 3 and proc.poll() is None
+            if finished_early:
+                proc.terminate()
+            proc.stdout.close()
+            returncode = proc.wait()
+        finally:
+            timer.cancel()
         
-        if result.returncode == 0:
-            domains = [
-                line.strip() 
-                for line in result.stdout.split('\n') 
-                if line.strip()
-            ]
-            domains = domains[:3]
-            while len(domains) < 2:
-                domains.append("General IT")
-            return domains[:3]
+        if finished_early or returncode == 0:
+            return domains
     except Exception as e:
         print(f"Error generating domain suggestions: {e}")
     
-    return ["General IT", "Software Development", "IT Operations"]
+    return None
+
+def generate_domain_suggestions(model: str = "gemma3:1b") -> List[str]:
+    """
+    Generate domain suggestions using Ollama.
+    Returns a list of 2-3 suggested domains.
+    """
+    eval_data = load_evaluation_results()
+    if not eval_data:
+        return list(FALLBACK_DOMAINS)
+    return _run_suggestion_model(_profile_key(eval_data), model) or list(FALLBACK_DOMAINS)
 
-def save_domain_suggestions(domains: List[str]) -> None:
-    """Save domain suggestions to JSON file."""
+def save_domain_suggestions(domains: List[str], profile: Optional[tuple] = None) -> None:
+    """Save domain suggestions (and the profile they were generated for) to JSON file."""
     try:
         data = {"suggested_domains": domains}
-        with open("data/domain_suggestions.json", "w") as f:
-            json.dump(data, f, indent=2)
+        if profile is not None:
+            data["profile"] = profile
+        ensure_data_dir()
+        write_json("data/domain_suggestions.json", data)
     except Exception as e:
         print(f"Error saving domain suggestions: {e}")
 
-def get_domain_suggestions() -> List[str]:
-    """Get domain suggestions, generating them if needed."""
+def _load_saved_suggestions(key: tuple) -> Optional[List[str]]:
+    """Return the saved suggestions if they were generated for this profile."""
     try:
-        with open("data/domain_suggestions.json", "r") as f:
-            data = json.load(f)
-            if "suggested_domains" in data:
-                return data["suggested_domains"]
+        data = read_json("data/domain_suggestions.json")
     except (FileNotFoundError, json.JSONDecodeError):
-        pass
+        return None
+    # JSON turns the key's tuples into lists, so compare in that form
+    if "suggested_domains" in data and data.get("profile") == loads_json(dumps_json(key)):
+        return data["suggested_domains"]
+    return None
+
+def get_domain_suggestions(model: str = "gemma3:1b") -> List[str]:
+    """
+    Get domain suggestions for the latest assessment.
+    
+    Identical profiles (same level, score and, in any order, the same strengths
+    and weak areas) reuse earlier suggestions from memory or the saved file
+    instead of running the model again. Failed generations are not cached.
+    """
+    eval_data = load_evaluation_results()
+    if not eval_data:
+        return list(FALLBACK_DOMAINS)
+    
+    key = _profile_key(eval_data)
+    cached = _suggestion_cache.get(key)
+    if cached is None:
+        cached = _load_saved_suggestions(key)
+    if cached is None:
+        cached = _run_suggestion_model(key, model)
+        if not cached:
+            return list(FALLBACK_DOMAINS)
+        save_domain_suggestions(cached, key)
     
-    domains = generate_domain_suggestions()
-    save_domain_suggestions(domains)
-    return domains
\ No newline at end of file
+    with _suggestion_cache_lock:
+        if key not in _suggestion_cache and len(_suggestion_cache) >= _SUGGESTION_CACHE_SIZE:
+            _suggestion_cache.pop(next(iter(_suggestion_cache)))
+        _suggestion_cache[key] = cached
+    return list(cached)
@@ -1,72 +1,220 @@
 import os
+import re
 import json
-import pdfplumber
-from docx import Document
+import asyncio
+import hashlib
+import threading
+import functools
+from itertools import chain
 from rapidfuzz import process, fuzz
 from typing import List, Dict, Optional, Union
+from modules.storage import ensure_data_dir, loads_json, read_json, write_json
+
+# A short line that is just a section title ("Technical Skills", "EXPERIENCE:")
+SKILLS_HEADING_RE = re.compile(
+    r'^\W*(?:technical\s+|core\s+|key\s+)?(?:skills?|technologies|tech\s+stack)\W*$',
+    re.IGNORECASE
+)
+SECTION_HEADING_RE = re.compile(
+    r'^\W*(?:(?:work|professional)\s+)?(?:experience|employment|education|projects?|'
+    r'certifications?|achievements|awards|publications|interests|hobbies|languages|'
+    r'summary|objective|references|contact)\W*$',
+    re.IGNORECASE
+)
+
+# Parsed resumes remembered per process
+RESUME_CACHE_SIZE = 64
+
+@functools.lru_cache(maxsize=None)
+def _load_pdfium():
+    """Import the native PDFium bindings on first PDF, or None if not installed."""
+    try:
+        # Much faster than pdfplumber's pure-Python pdfminer backend
+        import pypdfium2 as pdfium
+    except ImportError:
+        return None
+    return pdfium
 
 class InputHandler:
     def __init__(self):
         self.skills_file = os.path.join('data', 'skills_master.json')
         self.output_file = os.path.join('data', 'user_skills.json')
         self.skills = self._load_skills()
+        self._skill_lookup, self._skill_re = self._compile_skill_pattern(self.skills)
+        # Lower-cased master skills, aligned with self.skills, as the fuzzy matcher's queries
+        self._skills_lower = [skill.lower() for skill in self.skills]
+        # Content digest of a parsed resume -> skills found in it
+        self._resume_cache: Dict[tuple, tuple] = {}
+        self._resume_cache_lock = threading.Lock()
 
     def _load_skills(self) -> List[str]:
         """Load skills from the master skills file."""
         try:
-            with open(self.skills_file, 'r') as f:
-                data = json.load(f)
-                return data.get('skills', [])
+            data = read_json(self.skills_file)
+            return data.get('skills', [])
         except (FileNotFoundError, json.JSONDecodeError) as e:
             print(f"Error loading skills: {e}")
             return []
 
+    @staticmethod
+    def _compile_skill_pattern(skills: List[str]):
+        """Build one alternation regex over the master skills, longest names first."""
+        lookup = {skill.lower(): skill for skill in skills if skill.strip()}
+        if not lookup:
+            return lookup, None
+        alternatives = '|'.join(map(re.escape, sorted(lookup, key=len, reverse=True)))
+        # Lookarounds instead of \b so names ending in symbols ("C++", "Node.js") still match
+        return lookup, re.compile(r'(?<!\w)(' + alternatives + r')(?!\w)', re.IGNORECASE)
+
+    def match_skill_keywords(self, text: str) -> List[str]:
+        """Find master skills named verbatim in the text with a single regex pass."""
+        if not text or self._skill_re is None:
+            return []
+        # In order of first mention, so the same text always yields the same list
+        return list(dict.fromkeys(self._skill_lookup[m.group(1).lower()] for m in self._skill_re.finditer(text)))
+
     def extract_text_from_pdf(self, file_path: str) -> str:
-        """Extract text from PDF file."""
+        """Extract text from PDF file, using the native pdfium backend when installed."""
+        # PDF libraries are imported on first use, so sessions without uploads never load them
+        pdfium = _load_pdfium()
+        if pdfium is not None:
+            try:
+                return self._extract_text_with_pdfium(pdfium, file_path)
+            except Exception as e:
+                print(f"pdfium could not read PDF, falling back to pdfplumber: {e}")
         try:
+            import pdfplumber
             text = []
             with pdfplumber.open(file_path) as pdf:
                 for page in pdf.pages:
                     text.append(page.extract_text() or "")
+                    # Drop the page's parsed layout objects so only one page is held at a time
+                    page.close()
             return "\n".join(text)
         except Exception as e:
             print(f"Error extracting text from PDF: {e}")
             return ""
 
+    @staticmethod
+    def _extract_text_with_pdfium(pdfium, file_path: str) -> str:
+        """Extract text page by page with pypdfium2, releasing each page as it is done."""
+        text = []
+        # Closed explicitly: older pypdfium2 releases are not context managers
+        pdf = pdfium.PdfDocument(file_path)
+        try:
+            for page in pdf:
+                textpage = page.get_textpage()
+                try:
+                    text.append(textpage.get_text_range())
+                finally:
+                    textpage.close()
+                    page.close()
+        finally:
+            pdf.close()
+        return "\n".join(text)
+
     def extract_text_from_docx(self, file_path: str) -> str:
         """Extract text from DOCX file."""
         try:
+            from docx import Document
             doc = Document(file_path)
-            return "\n".join([paragraph.text for paragraph in doc.paragraphs])
+            return "\n".join(paragraph.text for paragraph in doc.paragraphs)
         except Exception as e:
             print(f"Error extracting text from DOCX: {e}")
             return ""
 
     def extract_skills_from_text(self, text: str) -> List[str]:
-        """Extract skills from text using fuzzy matching."""
+        """Extract skills from text: exact keyword hits plus fuzzy matches for the rest."""
         if not text or not self.skills:
             return []
 
-        found_skills = set()
-        for skill in self.skills:
-            # Use partial ratio to find partial matches
-            match = process.extractOne(
-                skill.lower(),
-                [text.lower()],
-                scorer=fuzz.partial_ratio,
-                score_cutoff=85  # Adjust threshold as needed
-            )
-            if match and match[1] >= 85:  # If match score is above threshold
-                found_skills.add(skill)
+        # Exact hits would score 100 anyway, so only the remaining skills need fuzzy scoring
+        found_skills = set(self.match_skill_keywords(text))
+        remaining = [i for i, skill in enumerate(self.skills) if skill not in found_skills]
+        if not remaining:
+            return [skill for skill in self.skills if skill in found_skills]
 
-        return list(found_skills)
+        # Score the remaining master skills against the lower-cased document in one batch
+        # call; the loop runs in C across all cores, and scores below the cutoff come back as 0
+        scores = process.cdist(
+            [self._skills_lower[i] for i in remaining],
+            [text.lower()],
+            scorer=fuzz.partial_ratio,
+            score_cutoff=85,  # Adjust threshold as needed
+            workers=-1
+        )
+        found_skills.update(self.skills[remaining[row]] for row in scores[:, 0].nonzero()[0])
+
+        # Master-list order keeps the result (and downstream cache keys) stable between runs
+        return [skill for skill in self.skills if skill in found_skills]
+
+    def find_skills_section(self, text: str) -> Optional[str]:
+        """Return the lines under a "Skills" heading, up to the next section heading."""
+        lines = text.splitlines()
+        start = end = None
+        for index, line in enumerate(lines):
+            stripped = line.strip()
+            if start is None:
+                if SKILLS_HEADING_RE.match(stripped):
+                    start = index + 1
+            elif SECTION_HEADING_RE.match(stripped) or SKILLS_HEADING_RE.match(stripped):
+                end = index
+                break
+        if start is None:
+            return None
+        section = "\n".join(lines[start:end]).strip()
+        return section or None
+
+    def extract_resume_skills(self, text: str) -> List[str]:
+        """Match skills across the whole resume, listing those from its Skills section first."""
+        # One matching pass over the whole text, so skills named only under Experience
+        # or Projects still count; the section only decides the order
+        text_skills = self.extract_skills_from_text(text)
+        section = self.find_skills_section(text)
+        if not section:
+            return text_skills
+        section_lower = section.lower()
+        # Stable sort: section skills first, each group keeping its master-list order
+        return sorted(text_skills, key=lambda skill: skill.lower() not in section_lower)
+
+    @staticmethod
+    def _file_digest(file_path: str) -> str:
+        """Content hash of a file, read in chunks so large uploads are not held in memory."""
+        digest = hashlib.blake2b(digest_size=16)
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 16), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
 
     def process_resume(self, file_path: str) -> List[str]:
-        """Process resume file and extract skills."""
+        """Process resume file and extract skills, reusing results for identical files."""
         if not file_path:
             return []
 
         file_ext = os.path.splitext(file_path)[1].lower()
+        # Gradio stores every upload under a new temp path, so key on content, not path
+        try:
+            cache_key = (self._file_digest(file_path), file_ext)
+        except OSError as e:
+            print(f"Error reading resume file: {e}")
+            return []
+        with self._resume_cache_lock:
+            cached = self._resume_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
+
+        skills = self._extract_resume_file(file_path, file_ext)
+        if not skills:
+            # Extraction failures are not cached, so a retry parses the file again
+            return skills
+        with self._resume_cache_lock:
+            if len(self._resume_cache) >= RESUME_CACHE_SIZE:
+                self._resume_cache.pop(next(iter(self._resume_cache)))
+            self._resume_cache[cache_key] = tuple(skills)
+        return skills
+
+    def _extract_resume_file(self, file_path: str, file_ext: str) -> List[str]:
+        """Extract text from a PDF/DOCX resume and match skills in it."""
         text = ""
         
         if file_ext == '.pdf':
@@ -74,18 +222,17 @@ class InputHandler:
         elif file_ext in ['.docx', '.doc']:
             text = self.extract_text_from_docx(file_path)
         
-        return self.extract_skills_from_text(text)
+        return self.extract_resume_skills(text)
 
     def load_skills_from_json(self, file_path: str) -> List[str]:
         """Load skills from a JSON file."""
         try:
-            with open(file_path, 'r') as f:
-                data = json.load(f)
-                if isinstance(data, dict):
-                    return data.get('skills', data.get('raw_skills', []))
-                elif isinstance(data, list):
-                    return data
-                return []
+            data = read_json(file_path)
+            if isinstance(data, dict):
+                return data.get('skills', data.get('raw_skills', []))
+            elif isinstance(data, list):
+                return data
+            return []
         except (FileNotFoundError, json.JSONDecodeError) as e:
             print(f"Error loading skills from JSON: {e}")
             return []
@@ -94,20 +241,28 @@ class InputHandler:
         """Parse skills from manual text input."""
         if not text:
             return []
+        text = text.strip()
+        # Accept a pasted JSON array ('["Python", "Git"]') instead of splitting it into garbage
+        if text.startswith('['):
+            try:
+                items = loads_json(text)
+            except json.JSONDecodeError:
+                items = None
+            if isinstance(items, list):
+                return [skill for skill in (str(item).strip() for item in items) if skill]
         # Split by commas and clean up the skills
-        return [skill.strip() for skill in text.split(',') if skill.strip()]
+        return [skill for skill in (part.strip() for part in text.split(',')) if skill]
 
     def save_skills(self, skills: List[str]) -> bool:
         """Save skills to the output file."""
         try:
             # Ensure the output directory exists
-            os.makedirs(os.path.dirname(self.output_file), exist_ok=True)
+            ensure_data_dir()
             
             # Prepare data to save
-            data = {"raw_skills": list(set(skills))}  # Remove duplicates
+            data = {"raw_skills": list(dict.fromkeys(skills))}  # Remove duplicates, keep order
             
-            with open(self.output_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            write_json(self.output_file, data)
             return True
         except Exception as e:
             print(f"Error saving skills: {e}")
@@ -130,27 +285,60 @@ class InputHandler:
         Returns:
             Dictionary with success status and list of skills
         """
-        all_skills = set()
-        
         # Process resume if provided
+        resume_skills = []
         if resume_path and os.path.exists(resume_path):
             resume_skills = self.process_resume(resume_path)
-            all_skills.update(resume_skills)
         
         # Process skills JSON if provided
+        json_skills = []
         if skills_json_path and os.path.exists(skills_json_path):
             json_skills = self.load_skills_from_json(skills_json_path)
-            all_skills.update(json_skills)
         
         # Process manual skills if provided
-        if manual_skills:
-            manual_skills_list = self.parse_manual_skills(manual_skills)
-            all_skills.update(manual_skills_list)
+        manual_skills_list = self.parse_manual_skills(manual_skills)
+        
+        return self._combine_and_save(resume_skills, json_skills, manual_skills_list)
+
+    async def process_inputs_async(
+        self,
+        resume_path: str = "",
+        skills_json_path: str = "",
+        manual_skills: str = ""
+    ) -> Dict[str, Union[bool, List[str]]]:
+        """
+        Same as process_inputs, but parses the independent sources concurrently.
+        
+        Resume extraction and JSON loading run on worker threads, so the total
+        time is that of the slowest source rather than the sum of all of them.
+        """
+        async def no_skills() -> List[str]:
+            return []
+        
+        resume_task = (
+            asyncio.to_thread(self.process_resume, resume_path)
+            if resume_path and os.path.exists(resume_path) else no_skills()
+        )
+        json_task = (
+            asyncio.to_thread(self.load_skills_from_json, skills_json_path)
+            if skills_json_path and os.path.exists(skills_json_path) else no_skills()
+        )
+        resume_skills, json_skills = await asyncio.gather(resume_task, json_task)
+        manual_skills_list = self.parse_manual_skills(manual_skills)
+        
+        return await asyncio.to_thread(
+            self._combine_and_save, resume_skills, json_skills, manual_skills_list
+        )
+
+    def _combine_and_save(self, *skill_lists: List[str]) -> Dict[str, Union[bool, List[str]]]:
+        """Merge skills from every input source and save them."""
+        # Order-preserving de-duplication in C: resume skills first, then JSON, then manual
+        all_skills = list(dict.fromkeys(chain.from_iterable(skill_lists)))
         
         # Save the combined skills
-        success = self.save_skills(list(all_skills))
+        success = self.save_skills(all_skills)
         
         return {
             "success": success,
-            "skills": list(all_skills)
+            "skills": all_skills
         }
@@ -1,6 +1,6 @@
 import json
-import os
 from pathlib import Path
+from modules.storage import ensure_data_dir, read_json, write_json
 
 def load_user_skills():
     """Load skills from user_skills.json"""
@@ -8,9 +8,8 @@ def load_user_skills():
     if not skills_file.exists():
         return []
     
-    with open(skills_file, "r") as f:
-        data = json.load(f)
-        return data.get("raw_skills", [])
+    data = read_json(skills_file)
+    return data.get("raw_skills", [])
 
 def generate_profile_summary(skills=None):
     """Generate a profile summary based on user skills"""
@@ -31,10 +30,9 @@ def save_profile_summary(skills=None):
     output = {"profile_summary": summary}
     
     # Ensure directory exists
-    os.makedirs("data", exist_ok=True)
+    ensure_data_dir()
     
-    with open("data/profile_summary.json", "w") as f:
-        json.dump(output, f, indent=4)
+    write_json("data/profile_summary.json", output)
     
     return output
 
@@ -1,7 +1,15 @@
 # modules/skill_normalizer.py
-import json
 import os
-from typing import List
+import sys
+from typing import List, Optional, Tuple
+from modules.storage import ensure_data_dir, read_json, write_json
+
+# (path, mtime_ns, size) of the last file read and the skills it held
+_normalized_cache: Optional[Tuple[Tuple[str, int, int], List[str]]] = None
+
+def _is_normalized(skill: str) -> bool:
+    """Cheap check that a skill is non-empty, trimmed and has no upper-case letters."""
+    return bool(skill) and skill == skill.strip() and (skill.islower() or not any(c.isalpha() for c in skill))
 
 def save_normalized_skills(skills: List[str]) -> List[str]:
     """
@@ -16,23 +24,48 @@ def save_normalized_skills(skills: List[str]) -> List[str]:
     if not skills:
         return []
         
-    # Simple normalization: convert to lowercase and strip whitespace
-    normalized_skills = [skill.strip().lower() for skill in skills if skill.strip()]
-    
-    # Remove duplicates while preserving order
-    seen = set()
-    unique_skills = []
-    for skill in normalized_skills:
-        if skill not in seen:
-            seen.add(skill)
-            unique_skills.append(skill)
+    # Simple normalization: convert to lowercase and strip whitespace, removing
+    # duplicates in the same pass (dict keys preserve first-seen order). Skills are
+    # interned so the same name from every session shares one string object.
+    if all(map(_is_normalized, skills)):
+        # Quick check passed (e.g. re-saving extracted skills): only de-duplicate
+        unique_skills = list(dict.fromkeys(map(sys.intern, skills)))
+    else:
+        unique_skills = list(dict.fromkeys(
+            sys.intern(skill) for skill in (raw.strip().lower() for raw in skills) if skill
+        ))
     
     # Save to file
     try:
-        os.makedirs("data", exist_ok=True)
-        with open("data/normalized_skills.json", "w") as f:
-            json.dump({"normalized_skills": unique_skills}, f, indent=2)
+        ensure_data_dir()
+        # Machine-read only, so write it compact
+        write_json("data/normalized_skills.json", {"normalized_skills": unique_skills}, indent=None)
         return unique_skills
     except Exception as e:
         print(f"❌ Error saving normalized skills: {e}")
-        return []
\ No newline at end of file
+        return []
+
+def load_normalized_skills() -> List[str]:
+    """Load skills from normalized_skills.json file, re-reading it only when it changes."""
+    global _normalized_cache
+    try:
+        filepath = os.path.join("data", "normalized_skills.json")
+        try:
+            stat = os.stat(filepath)
+        except FileNotFoundError:
+            print(f"[WARNING] File not found: {filepath}")
+            return []
+        
+        # Size guards against filesystems with coarse modification times
+        cache_key = (filepath, stat.st_mtime_ns, stat.st_size)
+        if _normalized_cache is not None and _normalized_cache[0] == cache_key:
+            return list(_normalized_cache[1])
+        
+        data = read_json(filepath)
+        skills = data.get("normalized_skills", [])
+        print(f"[INFO] Loaded {len(skills)} skills from {filepath}")
+        _normalized_cache = (cache_key, skills)
+        return list(skills)
+    except Exception as e:
+        print(f"[ERROR] Error loading normalized skills: {e}")
+        return []
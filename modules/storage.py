@@ -0,0 +1,78 @@
+# modules/storage.py
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+DATA_DIR = Path("data")
+
+_data_dir_ready = False
+
+def ensure_data_dir() -> Path:
+    """Create the data directory on first use and skip the syscall afterwards."""
+    global _data_dir_ready
+    if not _data_dir_ready:
+        DATA_DIR.mkdir(parents=True, exist_ok=True)
+        _data_dir_ready = True
+    return DATA_DIR
+
+def dumps_json(data: Any, indent: Optional[int] = 2) -> bytes:
+    """
+    Serialize data as UTF-8 JSON bytes.
+    
+    Pass indent=None for files that are only read back by the app: the compact
+    form is smaller and goes through the encoder's C fast path.
+    Uses orjson when it is installed and falls back to the standard library.
+    """
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if indent is not None else 0
+        return orjson.dumps(data, option=option)
+    if indent is not None:
+        return json.dumps(data, indent=indent, ensure_ascii=False).encode("utf-8")
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def loads_json(payload: Union[str, bytes]) -> Any:
+    """
+    Decode a JSON document with orjson when available.
+    
+    Decode errors are json.JSONDecodeError in both cases (orjson's error subclasses it).
+    """
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+def _write_if_changed(path: Path, payload: bytes) -> bool:
+    """
+    Replace path with payload atomically, skipping the write if the bytes match.
+    
+    The temp name is per thread so concurrent sessions never share a partial file,
+    and readers only ever see the old or the new document. Returns True if written.
+    """
+    try:
+        if path.read_bytes() == payload:
+            return False
+    except FileNotFoundError:
+        pass
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        tmp.write_bytes(payload)
+        tmp.replace(path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return True
+
+def write_json(path: Union[str, Path], data: Any, indent: Optional[int] = 2) -> bool:
+    """Serialize data with dumps_json and write it atomically if the content changed."""
+    return _write_if_changed(Path(path), dumps_json(data, indent))
+
+def read_json(path: Union[str, Path]) -> Any:
+    """Read a JSON file in one call and decode it with loads_json."""
+    with open(path, "rb") as f:
+        return loads_json(f.read())
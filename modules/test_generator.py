@@ -1,29 +1,111 @@
 """
 Module 3: Test Generator for SkillScope
-Generates skill tests using Ollama AI model (phi3:mini).
+Generates skill tests using Ollama AI model (phi3:mini by default, see SKILLSCOPE_MODEL).
 """
 import os
-import json
+import atexit
+import hashlib
 import random
+import re
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Any
+from pathlib import Path
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from modules.storage import dumps_json, ensure_data_dir, loads_json, read_json, write_json
+# Shared with the app so both see the same mtime-memoized skills list
+from modules.skill_normalizer import load_normalized_skills
 
-def load_normalized_skills() -> List[str]:
-    """Load skills from normalized_skills.json file."""
+try:
+    import requests
+except ImportError:
+    requests = None
+
+logger = logging.getLogger("skillscope.test_generator")
+
+# One pass over a model response: each line is a "Question:" header, an option
+# ("a) ...", "B: ...", "c. ...") or a "Correct Answer: x" marker; anything else is skipped.
+RESPONSE_LINE_RE = re.compile(
+    r"^[^\S\n]*(?:"
+    r"question:[^\S\n]*(?P<question>.*?)"
+    r"|[a-d][):.][^\S\n]*(?P<option>\S.*?)"
+    r"|correct answer:[^\S\n]*(?P<answer>[a-d])\b.*?"
+    r")[^\S\n]*$",
+    re.IGNORECASE | re.MULTILINE
+)
+# Option letters in display order, and letter (either case) -> option index for decoding.
+OPTION_LETTERS = "abcd"
+ANSWER_LETTER_INDEX = {letter: i % 4 for i, letter in enumerate(OPTION_LETTERS + OPTION_LETTERS.upper())}
+# Bump whenever the question prompt or model settings change, so cached tests are regenerated.
+PROMPT_VERSION = 4
+
+def _parallel_requests_from_env(default: int = 4) -> int:
+    """Read OLLAMA_NUM_PARALLEL, falling back to default when unset or not a number."""
+    value = os.environ.get("OLLAMA_NUM_PARALLEL")
+    if not value:
+        return default
     try:
-        filepath = os.path.join("data", "normalized_skills.json")
-        if os.path.exists(filepath):
-            with open(filepath, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                skills = data.get("normalized_skills", [])
-                print(f"[INFO] Loaded {len(skills)} skills from {filepath}")
-                return skills
-        else:
-            print(f"[WARNING] File not found: {filepath}")
-            return []
-    except Exception as e:
-        print(f"[ERROR] Error loading normalized skills: {e}")
-        return []
+        return max(1, int(value))
+    except ValueError:
+        print(f"[WARNING] Ignoring OLLAMA_NUM_PARALLEL={value!r} (not an integer), using {default}")
+        return default
+
+# Questions requested from Ollama at once; matches the server's own setting when exported.
+OLLAMA_NUM_PARALLEL = _parallel_requests_from_env()
+
+# "Correct Answer: x" ends a well-formed question; anything the model adds after it is discarded.
+CORRECT_ANSWER_RE = re.compile(r"correct answer:[^\S\n]*[abcd]", re.IGNORECASE)
+# Parsed Ollama questions keyed by a hash of the full request; set SKILLSCOPE_CACHE_DISABLE=1 to bypass.
+QUESTION_CACHE_DIR = Path("data") / "ollama_cache"
+QUESTION_CACHE_ENABLED = os.environ.get("SKILLSCOPE_CACHE_DISABLE", "").lower() not in ("1", "true", "yes")
+# Entries older than the max age are regenerated; past the entry cap the oldest files are removed.
+QUESTION_CACHE_MAX_AGE = 30 * 24 * 60 * 60
+QUESTION_CACHE_MAX_ENTRIES = 1000
+_question_cache_prune_lock = threading.Lock()
+
+OLLAMA_GENERATE_URL = "http://localhost:11434/api/generate"
+# Any Ollama tag works, e.g. a Q4_K_M build such as phi3:3.8b-mini-4k-instruct-q4_K_M
+QUESTION_MODEL = os.environ.get("SKILLSCOPE_MODEL", "phi3:mini")
+# The prompt plus the longest retry fits in 1024 tokens, so a smaller context saves KV-cache memory
+QUESTION_NUM_CTX = 1024
+# A full question with its options and answer line is well under 200 tokens; the stop
+# sequences end a response that starts on a second question or trails off in blank lines.
+QUESTION_OPTIONS = {
+    "temperature": 0.7,
+    "top_p": 0.9,
+    "num_ctx": QUESTION_NUM_CTX,
+    "num_predict": 200,
+    "stop": ["\n\nQuestion:", "\n\n\n"]
+}
+QUESTION_RETRY_OPTIONS = {**QUESTION_OPTIONS, "num_predict": 350}
+# How long Ollama keeps the model loaded after a request (its own default is 5m)
+OLLAMA_KEEP_ALIVE = os.environ.get("SKILLSCOPE_OLLAMA_KEEP_ALIVE", "30m")
+# Filled in per skill with str.format. The shared instructions come first and the skill
+# last, so Ollama can reuse the cached prompt prefix between questions on the same slot.
+QUESTION_PROMPT = """Generate ONE multiple-choice question to test knowledge of the skill named at the end.
+
+Requirements:
+1. Create ONE technical question about the skill
+2. Provide exactly 4 answer options (a, b, c, d)
+3. Mark the correct answer clearly
+4. Make it challenging and specific to the skill
+5. Focus on practical knowledge, not just definitions
+6. Ensure the question tests real understanding of the skill
+
+Format your response EXACTLY like this:
+Question: [Your question here]
+a) [Option A]
+b) [Option B]
+c) [Option C]
+d) [Option D]
+Correct Answer: [letter]
+
+Skill: {skill}
+Domain: {domain}
+
+Generate the question about {skill} now:"""
 
 def save_test_data(questions: List[Dict[str, Any]], test_id: str = None) -> str:
     """Save test questions to a JSON file.
@@ -46,80 +128,164 @@ def save_test_data(questions: List[Dict[str, Any]], test_id: str = None) -> str:
     }
     
     # Create data directory if it doesn't exist
-    os.makedirs('data', exist_ok=True)
+    ensure_data_dir()
     test_file = os.path.join('data', 'test.json')
     
     try:
-        with open(test_file, 'w', encoding='utf-8') as f:
-            json.dump(test_data, f, indent=2, ensure_ascii=False)
+        write_json(test_file, test_data)
         print(f"[INFO] Test data saved to {test_file}")
         return test_file
     except Exception as e:
         print(f"[ERROR] Failed to save test data: {e}")
         raise
 
-def generate_question_with_ollama(question_number: int, skill: str, domain: str) -> Dict[str, Any]:
-    """Generate a single question using Ollama API."""
+_session = None
+_session_lock = threading.Lock()
+
+def get_ollama_session():
+    """Return the shared requests.Session so all Ollama calls reuse keep-alive connections."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                # Enough pooled connections for every concurrent question request
+                adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=max(OLLAMA_NUM_PARALLEL, 10))
+                session.mount("http://", adapter)
+                atexit.register(session.close)
+                _session = session
+    return _session
+
+def _question_cache_path(payload: Dict[str, Any]) -> Path:
+    """Cache file for a request: model, prompt and sampling options all feed the key."""
+    key = {"model": payload["model"], "prompt": payload["prompt"], "options": payload["options"]}
+    digest = hashlib.blake2b(dumps_json(key, indent=None), digest_size=16).hexdigest()
+    return QUESTION_CACHE_DIR / f"{digest}.json"
+
+def _load_cached_question(path: Path) -> Optional[Dict[str, Any]]:
+    """Return the cached question at path, or None if missing, expired or unreadable."""
     try:
-        import requests
-        
-        # Ollama API endpoint
-        url = "http://localhost:11434/api/generate"
-        
-        # Create prompt for generating a question
-        prompt = f"""Generate ONE multiple-choice question to test knowledge of {skill} in {domain}.
+        if time.time() - path.stat().st_mtime > QUESTION_CACHE_MAX_AGE:
+            path.unlink(missing_ok=True)
+            return None
+        return read_json(path)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"[WARNING] Ignoring unreadable question cache {path.name}: {e}")
+        return None
 
-Requirements:
-1. Create ONE technical question about {skill}
-2. Provide exactly 4 answer options (a, b, c, d)
-3. Mark the correct answer clearly
-4. Make it challenging and specific to {skill}
-5. Focus on practical knowledge, not just definitions
-6. Ensure the question tests real understanding of {skill}
+def _save_cached_question(path: Path, question: Dict[str, Any]) -> None:
+    """Store a parsed question; a failed write only costs a model call next time."""
+    try:
+        QUESTION_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        write_json(path, question, indent=None)
+        _prune_question_cache()
+    except Exception as e:
+        print(f"[WARNING] Could not cache question: {e}")
 
-Format your response EXACTLY like this:
-Question: [Your question here]
-a) [Option A]
-b) [Option B]
-c) [Option C]
-d) [Option D]
-Correct Answer: [letter]
+def _prune_question_cache() -> None:
+    """Remove the least recently written entries once the cache exceeds its entry cap."""
+    # Saves come from the worker pool; one pruner at a time keeps them from racing on unlink
+    with _question_cache_prune_lock:
+        entries = []
+        for entry in os.scandir(QUESTION_CACHE_DIR):
+            if entry.name.endswith(".json"):
+                try:
+                    entries.append((entry.stat().st_mtime, entry.path))
+                except FileNotFoundError:
+                    continue
+        if len(entries) <= QUESTION_CACHE_MAX_ENTRIES:
+            return
+        entries.sort()
+        for _, entry_path in entries[:len(entries) - QUESTION_CACHE_MAX_ENTRIES]:
+            try:
+                os.remove(entry_path)
+            except FileNotFoundError:
+                pass
 
-Generate the question now:"""
+def _read_until_answer(response) -> Tuple[str, bool]:
+    """
+    Collect a streamed /api/generate response up to the "Correct Answer" line.
+    
+    Returning early closes the stream, which stops the generation and frees the
+    server slot for the next question instead of waiting out num_predict.
+    Also returns whether the model was cut off by num_predict.
+    """
+    text = ""
+    for chunk in response.iter_lines():
+        if not chunk:
+            continue
+        message = loads_json(chunk)
+        text += message.get("response", "")
+        if message.get("done"):
+            logger.debug("Ollama generated %s tokens (%s)", message.get("eval_count"), message.get("done_reason"))
+            return text, message.get("done_reason") == "length"
+        # The answer line is complete once a newline follows the letter
+        match = CORRECT_ANSWER_RE.search(text, max(0, len(text) - 200))
+        if match and "\n" in text[match.end():]:
+            break
+    return text, False
 
+def _request_question_text(payload: Dict[str, Any]) -> Tuple[Optional[str], bool]:
+    """Stream one generation; returns (text, truncated), or (None, False) on an API error."""
+    with get_ollama_session().post(OLLAMA_GENERATE_URL, json=payload, stream=True, timeout=60) as response:
+        if response.status_code != 200:
+            print(f"[ERROR] Ollama API error: {response.status_code} - {response.text}")
+            return None, False
+        text, truncated = _read_until_answer(response)
+    return text.strip(), truncated
+
+def generate_question_with_ollama(question_number: int, skill: str, domain: str) -> Dict[str, Any]:
+    """Generate a single question using Ollama API."""
+    if requests is None:
+        return generate_fallback_question(question_number, skill)
+    
+    try:
+        # The options dict is shared and never mutated
         payload = {
-            "model": "phi3:mini",
-            "prompt": prompt,
-            "stream": False,
-            "options": {
-                "temperature": 0.7,
-                "top_p": 0.9,
-                "num_predict": 500
-            }
+            "model": QUESTION_MODEL,
+            "prompt": QUESTION_PROMPT.format(skill=skill, domain=domain),
+            "stream": True,
+            "options": QUESTION_OPTIONS,
+            "keep_alive": OLLAMA_KEEP_ALIVE
         }
         
+        cache_path = _question_cache_path(payload) if QUESTION_CACHE_ENABLED else None
+        if cache_path is not None:
+            cached_question = _load_cached_question(cache_path)
+            if cached_question is not None:
+                print(f"[INFO] Using cached question for {skill}")
+                return cached_question
+        
         # Make request to Ollama
-        print(f"[DEBUG] Requesting Ollama for question {question_number} ({skill})...")
-        response = requests.post(url, json=payload, timeout=60)
+        logger.debug("Requesting Ollama for question %d (%s)...", question_number, skill)
+        generated_text, truncated = _request_question_text(payload)
+        if generated_text is None:
+            return generate_fallback_question(question_number, skill)
+        if not generated_text:
+            print(f"[WARNING] Ollama returned an empty response for {skill}")
+            return generate_fallback_question(question_number, skill)
         
-        if response.status_code == 200:
-            result = response.json()
-            generated_text = result.get("response", "").strip()
-            
-            print(f"[DEBUG] Ollama response received for question {question_number}")
-            print(f"[DEBUG] Response preview: {generated_text[:200]}...")
-            
-            # Parse the response into structured format
-            parsed_question = parse_ollama_response(generated_text, skill)
-            
-            if parsed_question:
-                print(f"[SUCCESS] Successfully generated question for {skill}")
-                return parsed_question
-            else:
-                print(f"[WARNING] Failed to parse Ollama response for {skill}")
-                return generate_fallback_question(question_number, skill)
+        logger.debug("Ollama response received for question %d", question_number)
+        logger.debug("Response preview: %.200s...", generated_text)
+        
+        # Parse the response into structured format
+        parsed_question = parse_ollama_response(generated_text, skill)
+        
+        # A rare long question can run out of tokens before the answer; allow one longer try
+        if not parsed_question and truncated:
+            print(f"[INFO] Response for {skill} hit the token limit, retrying with a larger one")
+            generated_text, _ = _request_question_text({**payload, "options": QUESTION_RETRY_OPTIONS})
+            parsed_question = parse_ollama_response(generated_text, skill) if generated_text else None
+        
+        if parsed_question:
+            print(f"[SUCCESS] Successfully generated question for {skill}")
+            if cache_path is not None:
+                _save_cached_question(cache_path, parsed_question)
+            return parsed_question
         else:
-            print(f"[ERROR] Ollama API error: {response.status_code} - {response.text}")
+            print(f"[WARNING] Failed to parse Ollama response for {skill}")
             return generate_fallback_question(question_number, skill)
             
     except requests.exceptions.ConnectionError as e:
@@ -131,37 +297,30 @@ Generate the question now:"""
         return generate_fallback_question(question_number, skill)
     except Exception as e:
         print(f"[ERROR] Error in generate_question_with_ollama: {type(e).__name__}: {str(e)}")
-        import traceback
-        print(f"[DEBUG] Traceback: {traceback.format_exc()}")
+        logger.debug("Traceback for question %d (%s)", question_number, skill, exc_info=True)
         return generate_fallback_question(question_number, skill)
 
 def parse_ollama_response(response_text: str, skill: str) -> Dict[str, Any]:
     """Parse Ollama response into structured question format."""
     try:
-        lines = response_text.strip().split('\n')
         question_text = ""
         options = []
         correct_answer = None
         
-        for line in lines:
-            line = line.strip()
-            
-            # Extract question
-            if line.lower().startswith("question:"):
-                question_text = line.split(":", 1)[1].strip()
-            
-            # Extract options
-            elif line and len(line) > 2 and line[0].lower() in 'abcd' and line[1] in '):':
-                option_text = line[3:].strip()
-                options.append(option_text)
+        if '\r' in response_text:
+            response_text = response_text.replace('\r\n', '\n').replace('\r', '\n')
+        
+        for match in RESPONSE_LINE_RE.finditer(response_text):
+            kind = match.lastgroup
             
-            # Extract correct answer
-            elif line.lower().startswith("correct answer:"):
-                answer_letter = line.split(":", 1)[1].strip().lower()
-                if answer_letter in 'abcd':
-                    answer_index = ord(answer_letter) - ord('a')
-                    if 0 <= answer_index < len(options):
-                        correct_answer = answer_letter
+            if kind == 'question':
+                question_text = match.group('question')
+            elif kind == 'option':
+                options.append(match.group('option'))
+            elif kind == 'answer':
+                answer_letter = match.group('answer').lower()
+                if ANSWER_LETTER_INDEX[answer_letter] < len(options):
+                    correct_answer = answer_letter
         
         # Validate parsed data
         if question_text and len(options) == 4 and correct_answer:
@@ -179,83 +338,118 @@ def parse_ollama_response(response_text: str, skill: str) -> Dict[str, Any]:
         print(f"[ERROR] Error parsing Ollama response: {e}")
         return None
 
+# Template questions for when Ollama is unavailable: (question with a {skill} slot, options with the correct one first)
+FALLBACK_TEMPLATES = (
+    (
+        "What is a primary use case for {skill} in modern software development?",
+        ("Building scalable applications",
+         "Managing version control systems",
+         "Debugging and testing code",
+         "Deploying applications to production"),
+    ),
+    (
+        "Which of the following best describes {skill}?",
+        ("A tool for improving developer productivity",
+         "A framework for building web applications",
+         "A database management system",
+         "An operating system component"),
+    ),
+    (
+        "What is a key advantage of using {skill}?",
+        ("Improved code maintainability",
+         "Better hardware performance",
+         "Reduced network latency",
+         "Enhanced graphic rendering"),
+    ),
+    (
+        "In which scenario would you typically use {skill}?",
+        ("When building modern software applications",
+         "When designing hardware circuits",
+         "When managing physical servers",
+         "When creating design mockups"),
+    ),
+)
+
 def generate_fallback_question(question_number: int, skill: str) -> Dict[str, Any]:
     """Generate a fallback question when Ollama is unavailable."""
-    question_templates = [
-        {
-            "question": f"What is a primary use case for {skill.upper()} in modern software development?",
-            "options": [
-                f"Building scalable applications",
-                f"Managing version control systems",
-                f"Debugging and testing code",
-                f"Deploying applications to production"
-            ],
-            "correct": 0
-        },
-        {
-            "question": f"Which of the following best describes {skill.upper()}?",
-            "options": [
-                f"A tool for improving developer productivity",
-                f"A framework for building web applications",
-                f"A database management system",
-                f"An operating system component"
-            ],
-            "correct": 0
-        },
-        {
-            "question": f"What is a key advantage of using {skill.upper()}?",
-            "options": [
-                f"Improved code maintainability",
-                f"Better hardware performance",
-                f"Reduced network latency",
-                f"Enhanced graphic rendering"
-            ],
-            "correct": 0
-        },
-        {
-            "question": f"In which scenario would you typically use {skill.upper()}?",
-            "options": [
-                f"When building modern software applications",
-                f"When designing hardware circuits",
-                f"When managing physical servers",
-                f"When creating design mockups"
-            ],
-            "correct": 0
-        }
-    ]
+    question_template, template_options = random.choice(FALLBACK_TEMPLATES)
     
-    template = random.choice(question_templates)
-    
-    # Shuffle options but track correct answer
-    correct_answer_text = template["options"][template["correct"]]
-    random.shuffle(template["options"])
-    correct_letter = chr(97 + template["options"].index(correct_answer_text))  # a, b, c, or d
+    # Shuffle option positions; the correct option is index 0 of the template
+    order = random.sample(range(4), 4)
+    correct_letter = OPTION_LETTERS[order.index(0)]  # a, b, c, or d
     
     return {
-        "question": template["question"],
-        "options": template["options"],
+        "question": question_template.format(skill=skill.upper()),
+        "options": [template_options[i] for i in order],
         "correct_answer": correct_letter,
-        "skill": skill
+        "skill": skill,
+        # Lets callers tell template questions apart from generated ones (e.g. to skip caching)
+        "fallback": True
     }
 
-def check_ollama_status() -> bool:
-    """Check if Ollama is running and phi3:mini model is available."""
+def warm_up_ollama() -> bool:
+    """
+    Ask Ollama to load the question model so the first test does not pay the cold start.
+    
+    An empty prompt only loads the model and generates nothing. Meant to run in the
+    background at startup; returns False (quietly) if the server is not reachable.
+    """
+    if requests is None:
+        return False
+    try:
+        # Same num_ctx as the questions, otherwise the first question reloads the model
+        payload = {
+            "model": QUESTION_MODEL,
+            "prompt": "",
+            "keep_alive": OLLAMA_KEEP_ALIVE,
+            "options": {"num_ctx": QUESTION_NUM_CTX}
+        }
+        response = get_ollama_session().post(OLLAMA_GENERATE_URL, json=payload, timeout=120)
+        if response.status_code == 200:
+            print(f"[INFO] Ollama model {QUESTION_MODEL} is loaded")
+            return True
+        print(f"[INFO] Could not preload {QUESTION_MODEL}: Ollama API error {response.status_code}")
+    except Exception as e:
+        print(f"[INFO] Could not preload {QUESTION_MODEL}: {type(e).__name__}")
+    return False
+
+OLLAMA_STATUS_TTL = 30.0
+_ollama_ready_at = None
+
+def check_ollama_status(force: bool = False) -> bool:
+    """
+    Check if Ollama is running and the question model is available.
+    
+    A successful probe is reused for OLLAMA_STATUS_TTL seconds so back-to-back tests
+    skip the /api/tags round-trip; failures are always re-probed. Pass force=True to
+    probe regardless.
+    """
+    global _ollama_ready_at
+    if not force and _ollama_ready_at is not None and time.monotonic() - _ollama_ready_at < OLLAMA_STATUS_TTL:
+        return True
+    _ollama_ready_at = None
+    if _probe_ollama():
+        _ollama_ready_at = time.monotonic()
+        return True
+    return False
+
+def _probe_ollama() -> bool:
+    """Ask the Ollama server for its model list and look for the question model."""
+    if requests is None:
+        return False
+    
     try:
-        import requests
-        
         # Check if Ollama is running
-        response = requests.get("http://localhost:11434/api/tags", timeout=5)
+        response = get_ollama_session().get("http://localhost:11434/api/tags", timeout=5)
         
         if response.status_code == 200:
-            models = response.json().get("models", [])
-            model_names = [m.get("name", "") for m in models]
-            
-            if any("phi3:mini" in name for name in model_names):
-                print("[INFO] ✅ Ollama is running and phi3:mini model is available")
+            models = loads_json(response.content).get("models", [])
+            if any(QUESTION_MODEL in m.get("name", "") for m in models):
+                print(f"[INFO] ✅ Ollama is running and {QUESTION_MODEL} model is available")
                 return True
             else:
-                print("[WARNING] ⚠️ Ollama is running but phi3:mini model not found")
-                print("[INFO] Run: ollama pull phi3:mini")
+                print(f"[WARNING] ⚠️ Ollama is running but {QUESTION_MODEL} model not found")
+                print(f"[INFO] Run: ollama pull {QUESTION_MODEL}")
                 return False
         else:
             print("[WARNING] ⚠️ Ollama is not responding properly")
@@ -265,21 +459,20 @@ def check_ollama_status() -> bool:
         print(f"[WARNING] ⚠️ Cannot connect to Ollama: {e}")
         return False
 
-def generate_test(skills: List[str] = None, domain: str = "Professional Skills") -> str:
-    """Generate a skill test based on skills from normalized_skills.json."""
-    # Load skills from file if not provided
-    if not skills:
-        skills = load_normalized_skills()
-    
-    if not skills:
-        return "❌ Error: No skills found. Please extract skills first."
-    
-    try:
-        import requests
-    except ImportError:
+def iter_test_questions(skills: List[str], domain: str = "Professional Skills") -> Iterator[Dict[str, Any]]:
+    """Yield ONE question per skill as soon as it has been generated."""
+    if requests is None:
         print("[WARNING] requests library not installed, using fallback questions")
     
-    questions = []
+    # Case variants and repeats of a skill would each cost a model call; keep the first spelling
+    unique_skills = {}
+    for skill in skills:
+        stripped = skill.strip() if skill else ""
+        if stripped:
+            unique_skills.setdefault(stripped.lower(), stripped)
+    if len(unique_skills) != len(skills):
+        print(f"[INFO] Deduped {len(skills)} -> {len(unique_skills)} skills")
+    skills = list(unique_skills.values())
     
     print(f"\n[INFO] Generating ONE question per skill for {len(skills)} skills...")
     
@@ -292,34 +485,73 @@ def generate_test(skills: List[str] = None, domain: str = "Professional Skills")
         print("[INFO] To use AI-generated questions:")
         print("       1. Install Ollama from https://ollama.ai")
         print("       2. Run: ollama serve")
-        print("       3. Run: ollama pull phi3:mini")
+        print(f"       3. Run: ollama pull {QUESTION_MODEL}")
     
-    # Generate exactly ONE question per skill
-    for i, skill in enumerate(skills, 1):
-        print(f"\n[INFO] === Question {i}/{len(skills)} for skill: {skill} ===")
+    # Generate exactly ONE question per skill; Ollama requests overlap, but questions
+    # are still yielded in skill order as soon as each one (and those before it) is ready
+    workers = min(OLLAMA_NUM_PARALLEL, len(skills)) if ollama_available else 1
+    if workers <= 1:
+        for i, skill in enumerate(skills, 1):
+            question = _generate_one_question(i, skill, domain, ollama_available)
+            if question:
+                yield question
+        return
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ollama-question")
+    try:
+        numbers = range(1, len(skills) + 1)
+        for question in executor.map(_generate_one_question, numbers, skills,
+                                     [domain] * len(skills), [ollama_available] * len(skills)):
+            if question:
+                yield question
+    finally:
+        # The consumer may stop early; drop requests that have not started yet
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def _generate_one_question(i: int, skill: str, domain: str, ollama_available: bool) -> Dict[str, Any]:
+    """Generate question number i for skill, falling back to a template on failure."""
+    print(f"\n[INFO] === Question {i} for skill: {skill} ===")
+    
+    try:
+        if ollama_available:
+            question = generate_question_with_ollama(i, skill, domain)
+        else:
+            print(f"[INFO] Using fallback question for {skill} (Ollama unavailable)")
+            question = generate_fallback_question(i, skill)
         
+        if question:
+            print(f"[SUCCESS] ✅ Question {i} added successfully")
+            return question
+        print(f"[WARNING] ⚠️  Failed to generate question for {skill}")
+    except Exception as e:
+        print(f"[ERROR] ❌ Error generating question for {skill}: {str(e)}")
+        # Try fallback
         try:
-            if ollama_available:
-                question = generate_question_with_ollama(i, skill, domain)
-            else:
-                print(f"[INFO] Using fallback question for {skill} (Ollama unavailable)")
-                question = generate_fallback_question(i, skill)
-            
-            if question:
-                questions.append(question)
-                print(f"[SUCCESS] ✅ Question {i} added successfully")
-            else:
-                print(f"[WARNING] ⚠️  Failed to generate question for {skill}")
-        except Exception as e:
-            print(f"[ERROR] ❌ Error generating question for {skill}: {str(e)}")
-            # Try fallback
-            try:
-                question = generate_fallback_question(i, skill)
-                if question:
-                    questions.append(question)
-                    print(f"[SUCCESS] ✅ Fallback question {i} added")
-            except:
-                continue
+            question = generate_fallback_question(i, skill)
+        except:
+            return None
+        if question:
+            print(f"[SUCCESS] ✅ Fallback question {i} added")
+            return question
+    return None
+
+def format_question(number: int, question: Dict[str, Any]) -> str:
+    """Format a single question in the plain-text test format."""
+    parts = [f"Question {number}: {question['question']}\n"]
+    parts.extend(f"{letter}) {option}\n" for letter, option in zip(OPTION_LETTERS, question['options']))
+    parts.append(f"Correct Answer: {question['correct_answer']}\n")
+    return "".join(parts)
+
+def generate_test(skills: List[str] = None, domain: str = "Professional Skills") -> str:
+    """Generate a skill test based on skills from normalized_skills.json."""
+    # Load skills from file if not provided
+    if not skills:
+        skills = load_normalized_skills()
+    
+    if not skills:
+        return "❌ Error: No skills found. Please extract skills first."
+    
+    questions = list(iter_test_questions(skills, domain))
     
     if not questions:
         return "❌ Error: Failed to generate any questions."
@@ -334,15 +566,7 @@ def generate_test(skills: List[str] = None, domain: str = "Professional Skills")
         print(f"[WARNING] Could not save test data: {e}")
     
     # Format questions for display
-    formatted_questions = []
-    for i, q in enumerate(questions, 1):
-        formatted = f"Question {i}: {q['question']}\n"
-        for j, option in enumerate(q['options']):
-            formatted += f"{chr(97+j)}) {option}\n"
-        formatted += f"Correct Answer: {q['correct_answer']}\n"
-        formatted_questions.append(formatted)
-    
-    return "\n".join(formatted_questions)
+    return "\n".join(format_question(i, q) for i, q in enumerate(questions, 1))
 
 if __name__ == "__main__":
     print("="*50)